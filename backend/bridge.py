@@ -6,8 +6,9 @@ import yfinance as yf
 import pandas as pd
 import numpy as np
 import requests
+import httpx
 from datetime import datetime, timedelta
-from supabase import create_client
+from supabase import create_client, ClientOptions
 from oauth2client.service_account import ServiceAccountCredentials
 from scipy.stats import linregress
 
@@ -31,7 +32,19 @@ if not GSPREAD_JSON:
 
 # 3. INITIALISATION
 try:
-    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+    # Client HTTP persistant : les appels Supabase successifs du script réutilisent la même connexion
+    supabase_http_client = httpx.Client(
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+        timeout=30,
+        # On garde les réglages par défaut de postgrest (HTTP/2, suivi des redirections)
+        http2=True,
+        follow_redirects=True
+    )
+    supabase = create_client(
+        SUPABASE_URL,
+        SUPABASE_KEY,
+        options=ClientOptions(httpx_client=supabase_http_client)
+    )
     print("✅ Client Supabase connecté.", flush=True)
 except Exception as e:
     print(f"❌ Crash Supabase : {e}", flush=True)
@@ -592,10 +605,15 @@ def get_financial_data(ticker, currency):
 
         df['val_eur'] = df['price'] * df['fx']
 
-        now_eur = df['val_eur'].iloc[-1]
-        prev_eur = df['val_eur'].iloc[-2]
-        week_eur = df['val_eur'].iloc[-6]
-        month_eur = df['val_eur'].iloc[-22]
+        # Conversion NumPy unique : tous les indicateurs ci-dessous lisent ces buffers
+        # au lieu de repasser par l'indexeur pandas (.iloc) à chaque accès
+        prices = df['price'].to_numpy(dtype=np.float64, copy=False)
+        values_eur = df['val_eur'].to_numpy(dtype=np.float64, copy=False)
+
+        now_eur = values_eur[-1]
+        prev_eur = values_eur[-2]
+        week_eur = values_eur[-6]
+        month_eur = values_eur[-22]
         
         ytd_date = f"{datetime.now().year}-01-01"
         start_year_eur = df[df.index < ytd_date]['val_eur'].iloc[-1]
@@ -610,8 +628,8 @@ def get_financial_data(ticker, currency):
         ma200_status = None
         try:
             if len(df) >= 200:
-                ma200_value = float(df['price'].rolling(window=200).mean().iloc[-1])
-                current_price = float(df['price'].iloc[-1])
+                ma200_value = float(prices[-200:].mean())
+                current_price = float(prices[-1])
                 ma200_status = "above" if current_price > ma200_value else "below"
             else:
                 print(f"      ⚠️ Pas assez de données pour MA200 ({len(df)} jours)", flush=True)
@@ -624,10 +642,10 @@ def get_financial_data(ticker, currency):
             if df_long is not None and len(df_long) >= 100:
                 if isinstance(df_long.columns, pd.MultiIndex): 
                     df_long.columns = df_long.columns.get_level_values(0)
-                prices = df_long['Close'].values
+                long_prices = df_long['Close'].to_numpy(dtype=np.float64)
                 # Créer un index numérique pour la régression (jours depuis le début)
-                x = np.arange(len(prices))
-                slope, intercept, r_value, p_value, std_err = linregress(x, prices)
+                x = np.arange(len(long_prices))
+                slope, intercept, r_value, p_value, std_err = linregress(x, long_prices)
                 trend_slope = float(slope)
             else:
                 print(f"      ⚠️ Pas assez d'historique pour régression 20 ans", flush=True)
@@ -638,12 +656,10 @@ def get_financial_data(ticker, currency):
         volatility_30d = None
         try:
             if len(df) >= 30:
-                # Calculer les rendements logarithmiques
-                returns = np.log(df['price'] / df['price'].shift(1)).dropna()
-                # Prendre les 30 derniers jours
-                recent_returns = returns.tail(30)
-                # Écart-type des rendements
-                std_dev = recent_returns.std()
+                # Rendements logarithmiques des 30 derniers jours (31 prix)
+                recent_returns = np.diff(np.log(prices[-31:]))
+                # Écart-type des rendements (ddof=1 comme pandas)
+                std_dev = np.std(recent_returns, ddof=1)
                 # Annualiser: multiplier par sqrt(252) pour les jours ouvrés
                 volatility_30d = float(std_dev * np.sqrt(252) * 100)  # En pourcentage
             else:
@@ -687,8 +703,8 @@ def get_financial_data(ticker, currency):
         momentum_20 = None
         try:
             if len(df) >= 21:
-                previous_price = df['price'].iloc[-21]
-                current_price = df['price'].iloc[-1]
+                previous_price = prices[-21]
+                current_price = prices[-1]
                 if previous_price and previous_price != 0:
                     momentum_20 = float(((current_price / previous_price) - 1) * 100)
             else:
@@ -745,7 +761,7 @@ def get_financial_data(ticker, currency):
                 last_trade_timestamp = datetime.now()
 
         # 6. Validation finale : Si timestamp invalide mais prix valide, forcer timestamp à maintenant
-        last_price = float(df['price'].iloc[-1])
+        last_price = float(prices[-1])
         if last_price > 0:
             # Vérifier si le timestamp final est invalide
             try:
@@ -784,8 +800,8 @@ def get_financial_data(ticker, currency):
                 "ytd": calc(now_eur, start_year_eur)
             },
             "perf_local": {
-                "day": calc(df['price'].iloc[-1], df['price'].iloc[-2]),
-                "ytd": calc(df['price'].iloc[-1], start_year_local)
+                "day": calc(prices[-1], prices[-2]),
+                "ytd": calc(prices[-1], start_year_local)
             },
             "ma200_value": ma200_value,
             "ma200_status": ma200_status,
@@ -813,9 +829,9 @@ def update_currencies():
         try:
             data = yf.download(ticker, period="2d", progress=False)
             if not data.empty:
-                # Correction FutureWarning float()
-                val = data['Close'].iloc[-1]
-                rate = float(val.iloc[0]) if hasattr(val, '__len__') else float(val)
+                # Aplatit Series/DataFrame (colonnes MultiIndex) en un seul tableau NumPy
+                close = data['Close'].to_numpy().ravel()
+                rate = float(close[-1])
                 
                 payload = {
                     "id": code,
@@ -833,6 +849,11 @@ def run_sync():
     if not client:
         return
 
+    # Horodatage unique pour tout le run (évite un datetime.now() par actif)
+    run_started_at = datetime.now()
+    now_iso = run_started_at.isoformat()
+    today_iso = run_started_at.date().isoformat()
+
     sheet_name = os.environ.get("GSHEET_NAME")
     try:
         sh = client.open(sheet_name).sheet1
@@ -1081,7 +1102,7 @@ def run_sync():
                 "market_cap": market_cap,
                 # Qualité des données
                 "data_status": data_status,
-                "last_update": datetime.now().isoformat()
+                "last_update": now_iso
             }
 
             if row_portfolio_id is not None:
@@ -1129,7 +1150,7 @@ def run_sync():
                     "pru": pru,
                     "target_weight_pct": target_weight_pct,
                     "geo_coverage": geo_coverage,
-                    "updated_at": datetime.now().isoformat(),
+                    "updated_at": now_iso,
                 }
                 try:
                     supabase.table("portfolio_positions").upsert(position_payload, on_conflict='portfolio_id,ticker').execute()
@@ -1169,12 +1190,12 @@ def run_sync():
             try:
                 snapshot_payload = {
                     "portfolio_id": portfolio_id,
-                    "snapshot_date": datetime.now().date().isoformat(),
+                    "snapshot_date": today_iso,
                     "total_value_eur": total_portfolio_value,
                     "covered_value_eur": covered_value,
                     "coverage_pct": coverage_pct,
                     "assets_count": len(assets_processed),
-                    "created_at": datetime.now().isoformat()
+                    "created_at": now_iso
                 }
                 supabase.table("valuation_snapshots").insert(snapshot_payload).execute()
                 print(f"    ✅ Snapshot enregistré dans valuation_snapshots (portfolio_id: {portfolio_id})", flush=True)
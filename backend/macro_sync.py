@@ -1,5 +1,6 @@
+import httpx
 import yfinance as yf
-from supabase import create_client
+from supabase import create_client, ClientOptions
 import os
 import pandas as pd
 from datetime import datetime
@@ -7,7 +8,15 @@ from datetime import datetime
 # Utilisation des secrets GitHub
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+# Un seul client pour tous les update() de la boucle macro_indicators (pas de reconnexion par ligne),
+# en HTTP/2 avec redirections comme le client que postgrest créerait lui-même
+supabase_http_client = httpx.Client(
+    limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+    timeout=30,
+    http2=True,
+    follow_redirects=True
+)
+supabase = create_client(SUPABASE_URL, SUPABASE_KEY, options=ClientOptions(httpx_client=supabase_http_client))
 
 def sync_macro():
     print("--- Début Synchro Macro ---")
@@ -26,12 +35,9 @@ def sync_macro():
                 df = yf.download(ticker, period="5d", progress=False)
                 
                 if not df.empty and len(df) >= 2:
-                    # Gestion propre des types pour éviter les Warnings
-                    last_close = df['Close'].iloc[-1]
-                    prev_close = df['Close'].iloc[-2]
-                    
-                    current = float(last_close.iloc[0]) if hasattr(last_close, 'iloc') else float(last_close)
-                    prev = float(prev_close.iloc[0]) if hasattr(prev_close, 'iloc') else float(prev_close)
+                    # Deux dernières clôtures en un seul accès, sans boxing pandas
+                    closes = df['Close'].to_numpy().ravel()[-2:]
+                    prev, current = float(closes[0]), float(closes[1])
                     
                     change = (current / prev) - 1
                     
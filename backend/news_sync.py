@@ -1,14 +1,22 @@
 import os
 import re
-import json
 import random
 import sys
 import time
 import feedparser
 import requests
-from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import httpx
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from supabase import create_client
+from typing import Literal
+from pydantic import BaseModel, ValidationError, field_validator
+from supabase import create_client, ClientOptions
 from urllib.parse import urlparse
 
 print("--- 📰 DÉMARRAGE DE LA SYNCHRONISATION DES ACTUALITÉS ---", flush=True)
@@ -28,8 +36,8 @@ def load_impact_rules():
             print(f"   Répertoire du script: {script_dir}", flush=True)
             print(f"   Liste des fichiers dans le répertoire: {list(script_dir.iterdir())}", flush=True)
         
-        with open(json_path, "r", encoding="utf-8") as f:
-            rules = json.load(f)
+        # orjson sur les octets bruts : pas de décodage texte ni de couche IO bufferisée
+        rules = orjson.loads(json_path.read_bytes())
         
         high_count = len(rules.get("high_impact", {}).get("keywords", []))
         medium_count = len(rules.get("medium_impact", {}).get("keywords", []))
@@ -60,6 +68,49 @@ def load_impact_rules():
 
 IMPACT_RULES = load_impact_rules()
 
+# Règles extraites une seule fois (plus de lookups imbriqués IMPACT_RULES.get(...) par article)
+HIGH_IMPACT_KEYWORDS = IMPACT_RULES.get("high_impact", {}).get("keywords", [])
+HIGH_IMPACT_SCORE_RANGE = tuple(IMPACT_RULES.get("high_impact", {}).get("score_range", [70, 100]))
+MEDIUM_IMPACT_KEYWORDS = IMPACT_RULES.get("medium_impact", {}).get("keywords", [])
+MEDIUM_IMPACT_SCORE_RANGE = tuple(IMPACT_RULES.get("medium_impact", {}).get("score_range", [40, 69]))
+OFFICIAL_SOURCES = frozenset(s.upper() for s in IMPACT_RULES.get("official_sources", {}).get("sources", []))
+OFFICIAL_SOURCE_SCORE = IMPACT_RULES.get("official_sources", {}).get("score", 95)
+
+def keyword_alternation(keywords: list) -> str:
+    """Alternation regex échappée d'une liste de mots-clés, les plus longs en premier."""
+    return "|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))
+
+def compile_impact_pattern(tiers: dict) -> re.Pattern | None:
+    """
+    Compile plusieurs niveaux de mots-clés en un seul automate regex insensible à la casse.
+    Chaque niveau est un groupe nommé : `match.lastgroup` donne le niveau détecté.
+    Même sémantique que `keyword in text` (sous-chaîne, sans bornes de mot) pour garder
+    les pluriels ("dividends", "mergers"). Retourne None si aucun mot-clé.
+    """
+    groups = [f"(?P<{name}>{keyword_alternation(keywords)})" for name, keywords in tiers.items() if keywords]
+    if not groups:
+        return None
+    return re.compile("|".join(groups), re.IGNORECASE)
+
+# Compilés une seule fois au chargement : un seul scan C (HIGH + MEDIUM) par article
+IMPACT_KEYWORDS_RE = compile_impact_pattern({"high": HIGH_IMPACT_KEYWORDS, "medium": MEDIUM_IMPACT_KEYWORDS})
+HIGH_IMPACT_RE = compile_impact_pattern({"high": HIGH_IMPACT_KEYWORDS})
+# (mot-clé tel qu'écrit dans impact_rules.json, version minuscule) dans l'ordre des règles
+HIGH_IMPACT_KEYWORD_PAIRS = tuple((k, k.lower()) for k in HIGH_IMPACT_KEYWORDS)
+MEDIUM_IMPACT_KEYWORD_PAIRS = tuple((k, k.lower()) for k in MEDIUM_IMPACT_KEYWORDS)
+
+def rule_order_keyword(keyword_pairs: tuple, text: str, match: re.Match) -> str:
+    """
+    Premier mot-clé du niveau détecté dans l'ordre d'impact_rules.json (priorité des règles),
+    pour l'explication affichée dans le frontend. Appelé uniquement quand la regex a matché.
+    """
+    text_lower = text.lower()
+    return next((keyword for keyword, keyword_lower in keyword_pairs if keyword_lower in text_lower), match.group(0).lower())
+
+# Pattern pour trouver des tickers (3-5 lettres majuscules, optionnellement précédé de $)
+# Appliqué au texte d'origine : les tickers sont déjà en majuscules dans les titres
+TICKER_RE = re.compile(r'\$?([A-Z]{3,5})\b')
+
 # 1. RÉCUPÉRATION DES VARIABLES
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
@@ -74,13 +125,107 @@ if not SUPABASE_KEY:
     exit(1)
 
 # 3. INITIALISATION SUPABASE
+class OrjsonHttpxClient(httpx.Client):
+    """Client httpx qui sérialise les corps JSON (upserts batch) avec orjson au lieu du json stdlib."""
+
+    def build_request(self, method, url, *, json=None, headers=None, **kwargs):
+        if json is not None:
+            headers = httpx.Headers(headers)
+            headers["Content-Type"] = "application/json"
+            kwargs["content"] = orjson.dumps(json)
+        return super().build_request(method, url, headers=headers, **kwargs)
+
 try:
-    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+    # Client HTTP persistant : les appels Supabase (y compris concurrents) partagent une connexion HTTP/2
+    supabase_http_client = OrjsonHttpxClient(
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+        timeout=30,
+        # Mêmes options que le client créé par postgrest : HTTP/2 multiplexé + redirections
+        http2=True,
+        follow_redirects=True
+    )
+    supabase = create_client(
+        SUPABASE_URL,
+        SUPABASE_KEY,
+        options=ClientOptions(httpx_client=supabase_http_client)
+    )
     print("✅ Client Supabase connecté.", flush=True)
 except Exception as e:
     print(f"❌ Crash Supabase : {e}", flush=True)
     exit(1)
 
+# Taille des batches d'upsert news_feed : 500 lignes par requête PostgREST
+# (un run complet tient en un seul appel, tout en bornant la taille du corps JSON)
+UPSERT_BATCH_SIZE = 500
+
+# === SESSION HTTP PARTAGÉE ===
+# Keep-alive + gzip : réutilise les connexions TCP/TLS entre les appels
+# User-Agent navigateur pour éviter les erreurs 403 (Fed/ECB)
+SESSION = requests.Session()
+SESSION.headers.update({
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept-Encoding": "gzip, deflate"
+})
+# Pool dimensionné pour les threads de sync_news (RSS + Marketaux en parallèle)
+# Retry avec backoff exponentiel sur les erreurs transitoires (pas sur 402 = quota Marketaux)
+# raise_on_status=False : la dernière réponse remonte à raise_for_status() comme avant
+# respect_retry_after_header=False : un Retry-After de plusieurs heures (429 Marketaux)
+# bloquerait un worker et donc le job planifié ; on garde le backoff court et borné
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        respect_retry_after_header=False,
+        raise_on_status=False
+    )
+))
+
+# === CONFIGURATION MARKETAUX ===
+# API Marketaux: https://marketaux.com/documentation
+MARKETAUX_URL = "https://api.marketaux.com/v1/news/all"
+MARKETAUX_BASE_PARAMS = {
+    "api_token": MARKETAUX_API_KEY,
+    "limit": 50,  # Augmenter la limite car on a plusieurs tickers
+    "filter_entities": True,
+    "language": "en"  # Filtrer les résultats en anglais
+}
+# Marketaux accepte au plus 10 symboles par requête
+MARKETAUX_TICKERS_PER_REQUEST = 10
+# Plafond global de tickers (quota API, erreur 402) : 10 par défaut, relevable via l'environnement.
+# Au-delà de 10, les tickers sont découpés en requêtes parallèles dans le pool de sync_news
+try:
+    MARKETAUX_MAX_TICKERS = int(os.environ.get("MARKETAUX_MAX_TICKERS") or 10)
+except ValueError:
+    print(f"⚠️ MARKETAUX_MAX_TICKERS invalide ({os.environ.get('MARKETAUX_MAX_TICKERS')!r}), utilisation de 10", flush=True)
+    MARKETAUX_MAX_TICKERS = 10
+if MARKETAUX_MAX_TICKERS < 1:
+    print(f"⚠️ MARKETAUX_MAX_TICKERS={MARKETAUX_MAX_TICKERS} ramené à 1 (au moins un ticker)", flush=True)
+    MARKETAUX_MAX_TICKERS = 1
+
+# === MODÈLE DE DONNÉES (ligne news_feed) ===
+class NewsItem(BaseModel):
+    """Article validé une seule fois à la construction, `model_dump` donne la ligne news_feed."""
+    url: str
+    title: str
+    description: str | None = None
+    source: str
+    category: str
+    ticker: str | None = None
+    impact_score: int
+    impact_level: Literal["HIGH", "MEDIUM", "LOW"]
+    impact_explanation: str
+    published_at: datetime
+    last_update: datetime
+
+    @field_validator("description", mode="before")
+    @classmethod
+    def truncate_description(cls, value):
+        # Limiter à 500 caractères (chaîne vide -> None)
+        return value[:500] if value else None
+
 # === CONFIGURATION DES SOURCES RSS ===
 # Note: Si l'URL ECB échoue, le script continuera avec Fed uniquement grâce au try/except
 RSS_SOURCES = [
@@ -97,51 +242,48 @@ RSS_SOURCES = [
 ]
 
 # === FONCTION DE CALCUL D'IMPACT BASÉE SUR JSON ===
-def calculate_impact(title: str, description: str, source: str) -> dict:
+@lru_cache(maxsize=4096)
+def calculate_impact(text: str, source: str) -> dict:
     """
     Calcule l'impact d'une news basé sur les règles JSON.
+    `text` est la concaténation "titre description" déjà construite par l'appelant.
+    Mémoïsé : un même titre republié (FED/ECB) n'est évalué qu'une fois par run.
+    Le dict retourné est partagé entre les appels, ne pas le modifier.
     Returns: {
         "impact_level": "HIGH" | "MEDIUM" | "LOW",
         "impact_score": int (0-100),
         "impact_explanation": str
     }
     """
-    text = (title + " " + (description or "")).lower()
-    source_normalized = source.upper()
-    
-    # 1. Vérifier si la source est officielle
-    official_sources = [s.upper() for s in IMPACT_RULES.get("official_sources", {}).get("sources", [])]
-    if source_normalized in official_sources:
-        official_score = IMPACT_RULES.get("official_sources", {}).get("score", 95)
+    # 1. Vérifier si la source est officielle (frozenset : lookup O(1))
+    if source.upper() in OFFICIAL_SOURCES:
         return {
             "impact_level": "HIGH",
-            "impact_score": official_score,
+            "impact_score": OFFICIAL_SOURCE_SCORE,
             "impact_explanation": f"Source officielle: {source}"
         }
     
-    # 2. Parcourir les keywords HIGH IMPACT
-    high_keywords = IMPACT_RULES.get("high_impact", {}).get("keywords", [])
-    for keyword in high_keywords:
-        if keyword.lower() in text:
-            score_range = IMPACT_RULES.get("high_impact", {}).get("score_range", [70, 100])
-            score = random.randint(score_range[0], score_range[1])
-            return {
-                "impact_level": "HIGH",
-                "impact_score": score,
-                "impact_explanation": f"Détection mot-clé: {keyword}"
-            }
+    # 2. Un seul scan sur l'union HIGH + MEDIUM (le groupe nommé donne le niveau)
+    match = IMPACT_KEYWORDS_RE.search(text) if IMPACT_KEYWORDS_RE else None
+    if match and match.lastgroup == "medium" and HIGH_IMPACT_RE:
+        # Un HIGH plus loin reste prioritaire : il ne peut commencer qu'après le match MEDIUM
+        match = HIGH_IMPACT_RE.search(text, match.start() + 1) or match
+    
+    # La regex décide du niveau ; l'explication suit l'ordre des règles, pas la position dans le texte
+    if match and match.lastgroup == "high":
+        return {
+            "impact_level": "HIGH",
+            "impact_score": random.randint(*HIGH_IMPACT_SCORE_RANGE),
+            "impact_explanation": f"Détection mot-clé: {rule_order_keyword(HIGH_IMPACT_KEYWORD_PAIRS, text, match)}"
+        }
     
-    # 3. Parcourir les keywords MEDIUM IMPACT
-    medium_keywords = IMPACT_RULES.get("medium_impact", {}).get("keywords", [])
-    for keyword in medium_keywords:
-        if keyword.lower() in text:
-            score_range = IMPACT_RULES.get("medium_impact", {}).get("score_range", [40, 69])
-            score = random.randint(score_range[0], score_range[1])
-            return {
-                "impact_level": "MEDIUM",
-                "impact_score": score,
-                "impact_explanation": f"Détection mot-clé: {keyword}"
-            }
+    # 3. Sinon keyword MEDIUM IMPACT
+    if match:
+        return {
+            "impact_level": "MEDIUM",
+            "impact_score": random.randint(*MEDIUM_IMPACT_SCORE_RANGE),
+            "impact_explanation": f"Détection mot-clé: {rule_order_keyword(MEDIUM_IMPACT_KEYWORD_PAIRS, text, match)}"
+        }
     
     # 4. Aucun match -> LOW IMPACT (pour ne pas polluer le Ticker Tape)
     return {
@@ -150,35 +292,77 @@ def calculate_impact(title: str, description: str, source: str) -> dict:
         "impact_explanation": "Aucun mot-clé détecté"
     }
 
+@lru_cache(maxsize=4096)
 def extract_ticker_from_text(text: str) -> str | None:
     """
     Extrait un ticker potentiel du texte (format: TICKER ou $TICKER).
-    Retourne None si aucun ticker n'est trouvé.
+    Retourne None si aucun ticker n'est trouvé. Mémoïsé par texte.
     """
-    # Pattern pour trouver des tickers (3-5 lettres majuscules, optionnellement précédé de $)
-    pattern = r'\$?([A-Z]{3,5})\b'
-    matches = re.findall(pattern, text.upper())
-    
-    if matches:
-        # Retourner le premier match qui semble être un ticker
-        return matches[0]
-    return None
+    # Texte d'origine (pas de copie .upper()) : "the", "and" ne sont plus pris pour des tickers
+    # search() s'arrête au premier match qui semble être un ticker (pas de liste complète)
+    match = TICKER_RE.search(text)
+    return match.group(1) if match else None
 
-def fetch_news_from_rss(rss_config: dict) -> list:
+def load_rss_cache() -> dict:
+    """
+    Charge les validateurs HTTP (ETag / Last-Modified) et les articles déjà traités
+    des flux RSS depuis rss_cache.
+    Retourne TOUJOURS un dict {url: ligne} (vide si la table est absente).
+    """
+    try:
+        response = supabase.table("rss_cache").select("url, etag, last_modified, news_items").execute()
+        return {row["url"]: row for row in response.data or []}
+    except Exception as e:
+        print(f"    ⚠️ Cache RSS indisponible (table rss_cache absente ?): {e}", flush=True)
+        return {}
+
+def save_rss_cache(url: str, etag: str | None, last_modified: str | None, news_items: list):
+    """
+    Sauvegarde les validateurs HTTP d'un flux RSS et ses articles déjà traités,
+    rejoués tels quels si le serveur répond 304 à la prochaine exécution.
+    """
+    try:
+        payload = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "news_items": news_items,
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        }
+        supabase.table("rss_cache").upsert(payload, on_conflict="url", returning="minimal").execute()
+    except Exception as e:
+        print(f"    ⚠️ Impossible de sauvegarder le cache RSS pour {url}: {e}", flush=True)
+
+def fetch_news_from_rss(rss_config: dict, now_iso: str, cache_entry: dict | None = None) -> list[NewsItem]:
     """
     Récupère les actualités depuis un flux RSS.
+    `now_iso` est l'horodatage UTC du run (last_update et date de repli).
+    `cache_entry` (ligne rss_cache) active une requête conditionnelle : sur 304 le flux
+    n'a pas changé, il n'est ni téléchargé ni parsé et les articles du cache sont rejoués.
     Retourne TOUJOURS une liste (jamais None) pour éviter les erreurs d'itération.
     """
     news_items = []
     
     try:
-        # Ajouter User-Agent pour éviter les erreurs 403 (Fed/ECB)
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
+        conditional_headers = {}
+        if cache_entry:
+            if cache_entry.get("etag"):
+                conditional_headers["If-None-Match"] = cache_entry["etag"]
+            if cache_entry.get("last_modified"):
+                conditional_headers["If-Modified-Since"] = cache_entry["last_modified"]
         
-        # Utiliser requests.get() avec headers avant de parser avec feedparser
-        response = requests.get(rss_config["url"], headers=headers, timeout=10)
+        # Télécharger via la session partagée (keep-alive + gzip) avant de parser avec feedparser
+        response = SESSION.get(rss_config["url"], headers=conditional_headers, timeout=10)
+        if response.status_code == 304:
+            # Même tolérance que sur le chemin 200 : un article invalide est ignoré, pas tout le flux
+            for item in cache_entry.get("news_items") or []:
+                try:
+                    news_items.append(NewsItem.model_validate({**item, "last_update": now_iso}))
+                except (ValidationError, TypeError) as e:
+                    detail = f"{e.error_count()} champ(s) invalide(s)" if isinstance(e, ValidationError) else "entrée illisible"
+                    print(f"    ⚠️ Article RSS en cache ignoré ({rss_config['source']}): {detail}", flush=True)
+            print(f"    ℹ️ {rss_config['source']}: flux inchangé (304), {len(news_items)} articles depuis le cache", flush=True)
+            return news_items
         response.raise_for_status()
         feed = feedparser.parse(response.content)
         
@@ -186,7 +370,7 @@ def fetch_news_from_rss(rss_config: dict) -> list:
             print(f"    ⚠️ Erreur parsing RSS {rss_config['source']}: {feed.bozo_exception}", flush=True)
             return news_items
         
-        for entry in feed.entries[:20]:  # Limiter à 20 articles par source
+        for entry in islice(feed.entries, 20):  # Limiter à 20 articles par source (sans copie)
             title = entry.get("title", "")
             description = entry.get("description", "") or entry.get("summary", "")
             link = entry.get("link", "")
@@ -195,42 +379,53 @@ def fetch_news_from_rss(rss_config: dict) -> list:
             if not link:
                 continue
             
+            # Texte combiné construit une seule fois pour l'impact et le ticker
+            combined = f"{title} {description or ''}"
+            
             # Calculer l'impact basé sur les règles JSON
-            impact_result = calculate_impact(
-                title,
-                description,
-                rss_config["source"]
-            )
+            impact_result = calculate_impact(combined, rss_config["source"])
             
             # Extraire le ticker si possible
-            ticker = extract_ticker_from_text(title + " " + description)
+            ticker = extract_ticker_from_text(combined)
             
-            # Formater la date
-            published_date = None
-            if published:
-                try:
-                    published_date = datetime(*published[:6]).isoformat()
-                except:
-                    published_date = datetime.now().isoformat()
+            # Formater la date (published_parsed est un struct_time UTC)
+            # time.strftime formate directement en C, sans construire de datetime par entrée ;
+            # une date aberrante est ensuite rejetée par la validation NewsItem
+            if isinstance(published, time.struct_time):
+                published_date = time.strftime("%Y-%m-%dT%H:%M:%S+00:00", published)
             else:
-                published_date = datetime.now().isoformat()
+                published_date = now_iso
             
-            news_items.append({
-                "url": link,
-                "title": title,
-                "description": description[:500] if description else None,  # Limiter à 500 caractères
-                "source": rss_config["source"],
-                "category": rss_config["category"],
-                "ticker": ticker,
-                "impact_score": impact_result["impact_score"],
-                "impact_level": impact_result["impact_level"],
-                "impact_explanation": impact_result["impact_explanation"],
-                "published_at": published_date,
-                "last_update": datetime.now().isoformat()
-            })
+            try:
+                news_items.append(NewsItem(
+                    url=link,
+                    title=title,
+                    description=description,
+                    source=rss_config["source"],
+                    category=rss_config["category"],
+                    ticker=ticker,
+                    impact_score=impact_result["impact_score"],
+                    impact_level=impact_result["impact_level"],
+                    impact_explanation=impact_result["impact_explanation"],
+                    published_at=published_date,
+                    last_update=now_iso
+                ))
+            except ValidationError as e:
+                print(f"    ⚠️ Article RSS ignoré ({link}): {e.error_count()} champ(s) invalide(s)", flush=True)
         
         print(f"    ✅ {rss_config['source']}: {len(news_items)} articles récupérés", flush=True)
         
+        # Mémoriser les validateurs pour la prochaine exécution
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            save_rss_cache(
+                rss_config["url"],
+                etag,
+                last_modified,
+                [news_item.model_dump(mode="json") for news_item in news_items]
+            )
+        
     except Exception as e:
         print(f"    ❌ Erreur RSS {rss_config['source']}: {e}", flush=True)
         # Retourner une liste vide au lieu de None en cas d'erreur
@@ -239,10 +434,11 @@ def fetch_news_from_rss(rss_config: dict) -> list:
     # S'assurer qu'on retourne toujours une liste (jamais None)
     return news_items if news_items else []
 
-def fetch_news_from_marketaux(tickers: list[str]) -> list:
+def fetch_news_from_marketaux(tickers: list[str], now_iso: str) -> list[NewsItem]:
     """
     Récupère les actualités depuis l'API Marketaux pour une liste de tickers (batching).
-    Limite à 10 tickers par requête pour respecter les limites API.
+    `now_iso` est l'horodatage UTC du run (last_update et date de repli).
+    Limite à MARKETAUX_TICKERS_PER_REQUEST tickers par requête pour respecter les limites API.
     Retourne TOUJOURS une liste (jamais None) pour éviter les erreurs d'itération.
     """
     news_items = []
@@ -255,22 +451,14 @@ def fetch_news_from_marketaux(tickers: list[str]) -> list:
         return []  # Retourner explicitement une liste vide
     
     try:
-        # API Marketaux: https://marketaux.com/documentation
-        # Supporte plusieurs tickers séparés par des virgules
-        url = "https://api.marketaux.com/v1/news/all"
-        
-        # Joindre les tickers avec des virgules (max 10 par requête)
-        symbols_str = ",".join(tickers[:10])  # Limiter à 10 tickers
-        
-        params = {
-            "symbols": symbols_str,
-            "api_token": MARKETAUX_API_KEY,
-            "limit": 50,  # Augmenter la limite car on a plusieurs tickers
-            "filter_entities": True,
-            "language": "en"  # Filtrer les résultats en anglais
-        }
+        # Supporte plusieurs tickers séparés par des virgules (max 10 par requête)
+        symbols_str = ",".join(tickers[:MARKETAUX_TICKERS_PER_REQUEST])
         
-        response = requests.get(url, params=params, timeout=15)
+        response = SESSION.get(
+            MARKETAUX_URL,
+            params={**MARKETAUX_BASE_PARAMS, "symbols": symbols_str},
+            timeout=15
+        )
         response.raise_for_status()
         data = response.json()
         
@@ -301,30 +489,29 @@ def fetch_news_from_marketaux(tickers: list[str]) -> list:
                     extracted_ticker = tickers[0]
                 
                 # Calculer l'impact basé sur les règles JSON
-                impact_result = calculate_impact(
-                    title,
-                    description,
-                    "MARKETAUX"
-                )
+                impact_result = calculate_impact(f"{title} {description or ''}", "MARKETAUX")
                 
                 # Formater la date
-                published_date = published if published else datetime.now().isoformat()
+                published_date = published if published else now_iso
                 
-                news_items.append({
-                    "url": url_link,
-                    "title": title,
-                    "description": description[:500] if description else None,
-                    "source": "MARKETAUX",
-                    "category": "EQUITY",  # News liées aux tickers = EQUITY
-                    "ticker": extracted_ticker,  # Ticker extrait depuis entities
-                    "impact_score": impact_result["impact_score"],
-                    "impact_level": impact_result["impact_level"],
-                    "impact_explanation": impact_result["impact_explanation"],
-                    "published_at": published_date,
-                    "last_update": datetime.now().isoformat()
-                })
+                try:
+                    news_items.append(NewsItem(
+                        url=url_link,
+                        title=title,
+                        description=description,
+                        source="MARKETAUX",
+                        category="EQUITY",  # News liées aux tickers = EQUITY
+                        ticker=extracted_ticker,  # Ticker extrait depuis entities
+                        impact_score=impact_result["impact_score"],
+                        impact_level=impact_result["impact_level"],
+                        impact_explanation=impact_result["impact_explanation"],
+                        published_at=published_date,
+                        last_update=now_iso
+                    ))
+                except ValidationError as e:
+                    print(f"    ⚠️ Article Marketaux ignoré ({url_link}): {e.error_count()} champ(s) invalide(s)", flush=True)
         
-        print(f"    ✅ Marketaux (batch de {len(tickers[:10])} tickers): {len(news_items)} articles récupérés", flush=True)
+        print(f"    ✅ Marketaux (batch de {len(tickers[:MARKETAUX_TICKERS_PER_REQUEST])} tickers): {len(news_items)} articles récupérés", flush=True)
         
         # Retourner explicitement la liste (jamais None)
         return news_items if news_items else []
@@ -347,120 +534,144 @@ def fetch_news_from_marketaux(tickers: list[str]) -> list:
 def cleanup_old_news():
     """Supprime les news de plus de 7 jours."""
     try:
-        cutoff_date = (datetime.now() - timedelta(days=7)).isoformat()
+        cutoff_date = (datetime.now(timezone.utc) - timedelta(days=7)).isoformat()
         
         # Supprimer les news plus anciennes que 7 jours
-        result = supabase.table("news_feed").delete().lt("published_at", cutoff_date).execute()
+        # returning=minimal + count=exact : seul le compteur revient, pas les lignes supprimées
+        result = (
+            supabase
+            .table("news_feed")
+            .delete(count="exact", returning="minimal")
+            .lt("published_at", cutoff_date)
+            .execute()
+        )
         
-        if result.data:
-            print(f"    🗑️ {len(result.data)} articles supprimés (>7 jours)", flush=True)
+        if result.count:
+            print(f"    🗑️ {result.count} articles supprimés (>7 jours)", flush=True)
         else:
             print(f"    ✅ Aucun article à supprimer", flush=True)
             
     except Exception as e:
         print(f"    ⚠️ Erreur nettoyage: {e}", flush=True)
 
-def sync_news():
-    """Synchronise toutes les actualités depuis les sources RSS et Marketaux."""
-    print("--- SYNCHRONISATION DES ACTUALITÉS ---", flush=True)
-    
-    all_news = []
-    
-    # 1. Récupérer les actualités depuis les sources RSS (Macro)
-    print("--- SOURCES RSS (MACRO) ---", flush=True)
-    for rss_config in RSS_SOURCES:
-        try:
-            news_items = fetch_news_from_rss(rss_config)
-            # Vérifier que news_items n'est pas None et est une liste avant d'étendre
-            if news_items and isinstance(news_items, list):
-                all_news.extend(news_items)
-            else:
-                print(f"    ⚠️ Aucune news récupérée depuis {rss_config['source']}", flush=True)
-        except Exception as e:
-            print(f"    ⚠️ Erreur lors de la récupération RSS {rss_config['source']}: {e}", flush=True)
-            # Continuer avec les autres sources même si une échoue
-            continue
-    
-    # 2. Récupérer les tickers depuis market_watch et fetch depuis Marketaux (OPTIMISÉ: 10 tickers max)
-    print("--- SOURCE MARKETAUX (TICKERS) ---", flush=True)
+def get_watchlist_tickers(limit: int | None = None) -> tuple[list, int]:
+    """
+    Récupère au plus `limit` tickers uniques tirés au hasard dans market_watch,
+    pour que le plafond quota couvre un sous-ensemble différent à chaque run.
+    Retourne (tickers, nombre total de tickers uniques) ; tickers est TOUJOURS une liste.
+    """
     try:
-        # Récupérer tous les tickers uniques depuis market_watch
-        response = supabase.table("market_watch").select("ticker").execute()
+        try:
+            # DISTINCT + tirage + LIMIT côté Postgres (sql/20261015_news_sync_distinct_tickers.sql)
+            response = supabase.rpc("get_distinct_watchlist_tickers", {"p_limit": limit}).execute()
+            rows = response.data or []
+            tickers = [item["ticker"] for item in rows]
+            total = rows[0]["total_count"] if rows else 0
+        except Exception as rpc_error:
+            # Fallback compatibilité schéma: fonction absente, dédoublonnage + tirage côté client
+            print(f"    ⚠️ RPC get_distinct_watchlist_tickers indisponible, fallback select: {rpc_error}", flush=True)
+            response = supabase.table("market_watch").select("ticker").execute()
+            all_tickers = list(set([item["ticker"] for item in response.data or [] if item.get("ticker")]))
+            total = len(all_tickers)
+            tickers = random.sample(all_tickers, min(limit, total)) if limit is not None else all_tickers
         
-        if response.data:
-            tickers = list(set([item["ticker"] for item in response.data if item.get("ticker")]))
-            print(f"    📊 {len(tickers)} tickers trouvés dans market_watch", flush=True)
-            
-            # Optimisation quota : Limiter à 10 tickers seulement pour éviter l'erreur 402
-            limited_tickers = tickers[:10]
-            print(f"    📦 Traitement de {len(limited_tickers)} tickers (limite quota): {', '.join(limited_tickers)}", flush=True)
-            
-            # Un seul appel batch pour les 10 tickers
-            news_items = fetch_news_from_marketaux(limited_tickers)
-            # Vérifier que news_items n'est pas None et n'est pas vide avant d'étendre
-            if news_items and isinstance(news_items, list):
-                all_news.extend(news_items)
-            else:
-                print(f"    ⚠️ Aucune news récupérée pour le batch de {len(limited_tickers)} tickers", flush=True)
-            
-            if len(tickers) > 10:
-                print(f"    ℹ️ {len(tickers) - 10} tickers ignorés pour respecter le quota API", flush=True)
-        else:
-            print("    ⚠️ Aucun ticker trouvé dans market_watch", flush=True)
-            
+        if tickers:
+            print(f"    📊 {total} tickers trouvés dans market_watch", flush=True)
+            return tickers, total
+        
+        print("    ⚠️ Aucun ticker trouvé dans market_watch", flush=True)
     except Exception as e:
         print(f"    ⚠️ Erreur récupération tickers: {e}", flush=True)
         # Continuer même si la récupération des tickers échoue
     
-    # Dédupliquer par URL et upsert dans Supabase
-    seen_urls = set()
-    unique_news = []
+    return [], 0
+
+def chunks(iterable, size: int):
+    """Découpe paresseusement un itérable en listes de `size` éléments maximum."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def sync_news():
+    """Synchronise toutes les actualités depuis les sources RSS et Marketaux."""
+    print("--- SYNCHRONISATION DES ACTUALITÉS ---", flush=True)
     
-    for news in all_news:
-        url = news["url"]
-        if url not in seen_urls:
-            seen_urls.add(url)
-            unique_news.append(news)
+    # Horodatage UTC unique pour tout le run (last_update de chaque article)
+    now_iso = datetime.now(timezone.utc).isoformat()
     
-    print(f"--- UPSERT DE {len(unique_news)} ARTICLES UNIQUES ---", flush=True)
+    # Dédoublonnage à l'ingestion : URL -> article (la première occurrence l'emporte)
+    all_news: dict[str, NewsItem] = {}
     
-    # Upsert par batch pour optimiser
-    batch_size = 10
-    for i in range(0, len(unique_news), batch_size):
-        batch = unique_news[i:i + batch_size]
+    # 1. Sources RSS (Macro) + tickers market_watch + Marketaux (Tickers) en une seule vague concurrente
+    # Tout est I/O réseau : les flux RSS partent pendant la lecture de market_watch,
+    # le temps total devient max(RSS, market_watch + Marketaux)
+    print("--- SOURCES RSS (MACRO) + MARKETAUX (TICKERS) ---", flush=True)
+    rss_cache = load_rss_cache()
+    # Un worker par flux RSS, un pour market_watch, un par requête Marketaux
+    marketaux_requests = -(-MARKETAUX_MAX_TICKERS // MARKETAUX_TICKERS_PER_REQUEST)
+    with ThreadPoolExecutor(max_workers=len(RSS_SOURCES) + 1 + marketaux_requests) as executor:
+        tickers_future = executor.submit(get_watchlist_tickers, MARKETAUX_MAX_TICKERS)
+        jobs = [
+            (
+                rss_config["source"],
+                executor.submit(fetch_news_from_rss, rss_config, now_iso, rss_cache.get(rss_config["url"]))
+            )
+            for rss_config in RSS_SOURCES
+        ]
+        
+        # 2. Tickers depuis market_watch (OPTIMISÉ: MARKETAUX_MAX_TICKERS max), attendus pendant que le RSS tourne
+        # Optimisation quota : le plafond est appliqué au tirage pour éviter l'erreur 402
+        limited_tickers, total_tickers = tickers_future.result()
+        if limited_tickers:
+            print(f"    📦 Traitement de {len(limited_tickers)} tickers (limite quota): {', '.join(limited_tickers)}", flush=True)
+        if total_tickers > len(limited_tickers):
+            print(f"    ℹ️ {total_tickers - len(limited_tickers)} tickers ignorés pour respecter le quota API (tirage différent à chaque run)", flush=True)
+        
+        # Un appel batch par groupe de 10 tickers, tous en parallèle
+        for ticker_batch in chunks(limited_tickers, MARKETAUX_TICKERS_PER_REQUEST):
+            jobs.append((
+                f"le batch de {len(ticker_batch)} tickers",
+                executor.submit(fetch_news_from_marketaux, ticker_batch, now_iso)
+            ))
         
+        # Lecture dans l'ordre de soumission (RSS puis Marketaux) pour un dédoublonnage stable
+        for label, future in jobs:
+            try:
+                news_items = future.result()
+                # Vérifier que news_items n'est pas None et est une liste avant d'étendre
+                if news_items and isinstance(news_items, list):
+                    for news_item in news_items:
+                        all_news.setdefault(news_item.url, news_item)
+                else:
+                    print(f"    ⚠️ Aucune news récupérée depuis {label}", flush=True)
+            except Exception as e:
+                print(f"    ⚠️ Erreur lors de la récupération {label}: {e}", flush=True)
+                # Continuer avec les autres sources même si une échoue
+                continue
+    
+    # Articles déjà dédoublonnés par URL, upsert dans Supabase
+    print(f"--- UPSERT DE {len(all_news)} ARTICLES UNIQUES ---", flush=True)
+    
+    # Upsert par batch : un seul appel PostgREST multi-lignes par batch
+    # Les batches sont tirés à la volée du dict, sans liste intermédiaire
+    for batch_number, batch_items in enumerate(chunks(all_news.values(), UPSERT_BATCH_SIZE), start=1):
         try:
-            # Upsert avec URL comme clé unique
-            for news_item in batch:
-                payload = {
-                    "url": news_item["url"],
-                    "title": news_item["title"],
-                    "description": news_item["description"],
-                    "source": news_item["source"],
-                    "category": news_item["category"],
-                    "ticker": news_item["ticker"],
-                    "impact_score": news_item["impact_score"],
-                    "impact_level": news_item["impact_level"],
-                    "published_at": news_item["published_at"],
-                    "last_update": news_item["last_update"]
-                }
-                
-                # Ajouter impact_explanation si disponible (optionnel pour compatibilité)
-                if "impact_explanation" in news_item:
-                    payload["impact_explanation"] = news_item["impact_explanation"]
-                
-                supabase.table("news_feed").upsert(payload, on_conflict="url").execute()
+            # NewsItem.model_dump donne directement le schéma de news_feed
+            batch = [news_item.model_dump(mode="json") for news_item in batch_items]
+            # Upsert avec URL comme clé unique, sans renvoyer les lignes insérées
+            supabase.table("news_feed").upsert(batch, on_conflict="url", returning="minimal").execute()
             
-            print(f"    ✅ Batch {i//batch_size + 1}: {len(batch)} articles synchronisés", flush=True)
+            print(f"    ✅ Batch {batch_number}: {len(batch)} articles synchronisés", flush=True)
             
         except Exception as e:
-            print(f"    ❌ Erreur upsert batch {i//batch_size + 1}: {e}", flush=True)
+            print(f"    ❌ Erreur upsert batch {batch_number}: {e}", flush=True)
     
     # 3. Nettoyage : Supprimer les news de plus de 7 jours
+    # Volontairement après l'upsert : un flux peut renvoyer des articles anciens à purger
     print("--- NETTOYAGE DES ANCIENNES NEWS ---", flush=True)
     cleanup_old_news()
     
-    print(f"--- ✅ SYNCHRONISATION TERMINÉE: {len(unique_news)} articles ---", flush=True)
+    print(f"--- ✅ SYNCHRONISATION TERMINÉE: {len(all_news)} articles ---", flush=True)
 
 if __name__ == "__main__":
     sync_news()
@@ -0,0 +1,5 @@
+-- News sync - Index for the 7-day cleanup DELETE on news_feed.published_at
+-- Run in Supabase SQL editor before/with backend rollout.
+
+create index if not exists idx_news_feed_published_at
+  on public.news_feed(published_at);
@@ -0,0 +1,26 @@
+-- News sync - Distinct watchlist tickers computed server-side, with DISTINCT + LIMIT (news_sync.py)
+-- Run in Supabase SQL editor before/with backend rollout.
+
+-- Supprime les versions intermédiaires si elles ont déjà été appliquées (signature ou type de retour différents)
+drop function if exists public.get_distinct_watchlist_tickers();
+drop function if exists public.get_distinct_watchlist_tickers(integer);
+
+-- p_limit null = tous les tickers.
+-- order by random() : sous le plafond quota, chaque run couvre un sous-ensemble différent
+-- de la watchlist (pas toujours les N premiers). total_count = taille réelle de la watchlist
+-- (fenêtre évaluée avant le LIMIT), pour les logs côté script.
+create or replace function public.get_distinct_watchlist_tickers(p_limit integer default null)
+returns table (ticker text, total_count bigint)
+language sql
+volatile
+as $$
+  select t.ticker, count(*) over () as total_count
+  from (
+    select distinct mw.ticker
+    from public.market_watch mw
+    where mw.ticker is not null
+      and mw.ticker <> ''
+  ) t
+  order by random()
+  limit p_limit;
+$$;
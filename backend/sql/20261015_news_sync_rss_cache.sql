@@ -0,0 +1,13 @@
+-- News sync - HTTP validators per RSS feed for conditional GET (news_sync.py)
+-- Run in Supabase SQL editor before/with backend rollout.
+
+create table if not exists public.rss_cache (
+  url text primary key,
+  etag text,
+  last_modified text,
+  updated_at timestamptz not null default now()
+);
+
+-- Post-processed articles of the last 200 response, replayed on 304 Not Modified
+alter table if exists public.rss_cache
+  add column if not exists news_items jsonb;